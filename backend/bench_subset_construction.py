@@ -0,0 +1,59 @@
+# Benchmark: sequential vs parallel subset construction as the worker count grows.
+#
+# Run: python bench_subset_construction.py ["(a|b)*a(a|b){14}"] [repeats]
+# The default regex has a 2^15 state DFA (the n-th symbol from the end must be 'a').
+#
+# Why process_regex keeps NFAtoDFAConverter when DFA_WORKERS=1 although the
+# in-process step table is often ~2x faster here: the step table caches the
+# ε-closure of every transition target it touches. For ε-heavy NFAs with small
+# DFAs that cache is the dominant cost, e.g. ([a-z]*){400} (a 2-state DFA):
+# sequential ~0.3 s / 0.4 MB peak, step table ~1.0 s / 19 MB peak. The step
+# table only pays off for large DFAs, which is where the pool is used anyway.
+# Try: python bench_subset_construction.py "([a-z]*){400}"
+
+import os
+import sys
+import time
+
+from regex_to_nfa import regex_to_tokens, parse_tokens_to_ast, thompson_construct_nfa
+from nfa_to_dfa import NFAtoDFAConverter, ParallelNFAtoDFAConverter
+
+
+def best_of(repeats, fn):
+    best = None
+    for _ in range(repeats):
+        t = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    regex = sys.argv[1] if len(sys.argv) > 1 else '(a|b)*a(a|b){14}'
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    nfa = thompson_construct_nfa(parse_tokens_to_ast(regex_to_tokens(regex)))
+
+    base, dfa = best_of(repeats, lambda: NFAtoDFAConverter(nfa).convert())
+    print(f"regex {regex!r}: {len(nfa) - 1} NFA states, {len(dfa.states)} DFA states")
+    print(f"{'mode':<24}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+    print(f"{'sequential':<24}{1:>8}{base:>10.3f}{1.0:>9.2f}")
+
+    # workers=1 never starts a pool: this row measures the step-table algorithm alone
+    elapsed, pdfa = best_of(repeats, lambda: ParallelNFAtoDFAConverter(nfa, workers=1).convert())
+    assert pdfa.to_dict() == dfa.to_dict(), "step-table result differs from sequential"
+    print(f"{'step-table (in-process)':<24}{1:>8}{elapsed:>10.3f}{base / elapsed:>9.2f}")
+
+    cores = os.cpu_count() or 1
+    counts = sorted({2, 4, 8, 16, cores} & set(range(2, cores + 1)))
+    if not counts:
+        print(f"only {cores} core available: no multi-core (pool) run was done")
+    for workers in counts:
+        # the first run also starts the long-lived pool; best_of keeps the warm runs
+        elapsed, pdfa = best_of(repeats + 1, lambda: ParallelNFAtoDFAConverter(nfa, workers=workers).convert())
+        assert pdfa.to_dict() == dfa.to_dict(), "pool result differs from sequential"
+        print(f"{'process pool':<24}{workers:>8}{elapsed:>10.3f}{base / elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
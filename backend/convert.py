@@ -1,12 +1,12 @@
 import os
-from typing import Dict
+from typing import Dict, Iterator
 
 from regex_to_nfa import (
     regex_to_tokens,
     parse_tokens_to_ast,
     thompson_construct_nfa,
 )
-from nfa_to_dfa import NFAtoDFAConverter
+from nfa_to_dfa import NFAtoDFAConverter, ParallelNFAtoDFAConverter
 from minimize_dfa import DFAMinimizer
 from graph_render import render_png, save_json
 
@@ -14,7 +14,18 @@ BASE_DIR = os.path.dirname(__file__)
 OUTPUT_DIR = os.path.join(BASE_DIR, 'static', 'output')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-def process_regex(regex: str, uid: str) -> Dict[str, str]:
+# Worker processes for subset construction (0 = all cores). With 1 (default)
+# the plain sequential converter is used: its memory stays flat on ε-heavy
+# regexes, where the step table is slower (see bench_subset_construction.py).
+# Otherwise a long-lived pool is only used once a BFS frontier is large, so
+# small regexes never pay for it.
+DFA_WORKERS = int(os.environ.get('DFA_WORKERS', 1))
+
+# The streamed DFA is only a live preview of what /convert builds, so it stops
+# after this many states (the frontend draws at most this many anyway).
+STREAM_MAX_STATES = int(os.environ.get('STREAM_MAX_STATES', 150))
+
+def process_regex(regex: str, uid: str) -> Dict[str, object]:
     """Regex → NFA → DFA → MinDFA; renders PNG/JSON and returns URL paths."""
     # 1) Regex → Tokens → AST
     tokens = regex_to_tokens(regex)
@@ -24,20 +35,25 @@ def process_regex(regex: str, uid: str) -> Dict[str, str]:
     nfa_dict = thompson_construct_nfa(ast)
 
     # 3) NFA → DFA (dict)
-    dfa_obj = NFAtoDFAConverter(nfa_dict).convert()
+    if DFA_WORKERS == 1:
+        dfa_obj = NFAtoDFAConverter(nfa_dict).convert()
+    else:
+        dfa_obj = ParallelNFAtoDFAConverter(nfa_dict, workers=DFA_WORKERS or None).convert()
     dfa_dict = dfa_obj.to_dict()
 
     # 4) Minimize DFA (dict)
     mindfa_dict = DFAMinimizer(dfa_dict).to_dict()
 
-    # 5) Render PNGs
+    # 5) Render PNGs (level of detail depends on size; huge automata are not drawn)
     nfa_png_path = os.path.join(OUTPUT_DIR, f"{uid}_nfa.png")
     dfa_png_path = os.path.join(OUTPUT_DIR, f"{uid}_dfa.png")
     mindfa_png_path = os.path.join(OUTPUT_DIR, f"{uid}_mindfa.png")
 
-    render_png(nfa_dict, nfa_png_path, kind='nfa')
-    render_png(dfa_dict, dfa_png_path, kind='dfa')
-    render_png(mindfa_dict, mindfa_png_path, kind='dfa')
+    render = {
+        "nfa": render_png(nfa_dict, nfa_png_path, kind='nfa'),
+        "dfa": render_png(dfa_dict, dfa_png_path, kind='dfa'),
+        "mindfa": render_png(mindfa_dict, mindfa_png_path, kind='dfa'),
+    }
 
     # 6) Save JSONs
     nfa_json_path = os.path.join(OUTPUT_DIR, f"{uid}_nfa.json")
@@ -49,13 +65,37 @@ def process_regex(regex: str, uid: str) -> Dict[str, str]:
     save_json(mindfa_dict, mindfa_json_path)
 
     # 7) Response payload (frontend can store these URLs in localStorage)
+    #    image URLs are None when no PNG was written; 'render' says why
+    def img_url(name):
+        return f"/static/output/{uid}_{name}.png" if render[name]["rendered"] else None
+
     return {
         "id": uid,
         "regex": regex,
-        "nfa_img": f"/static/output/{uid}_nfa.png",
-        "dfa_img": f"/static/output/{uid}_dfa.png",
-        "mindfa_img": f"/static/output/{uid}_mindfa.png",
+        "nfa_img": img_url("nfa"),
+        "dfa_img": img_url("dfa"),
+        "mindfa_img": img_url("mindfa"),
         "nfa_json": f"/static/output/{uid}_nfa.json",
         "dfa_json": f"/static/output/{uid}_dfa.json",
         "mindfa_json": f"/static/output/{uid}_mindfa.json",
+        "render": render,
     }
+
+
+def stream_dfa(regex: str, max_states: int = STREAM_MAX_STATES) -> Iterator[dict]:
+    """Regex → NFA eagerly (so syntax errors surface before streaming starts),
+    then the DFA construction events from NFAtoDFAConverter.iter_construct().
+    Stops after max_states states with a {"type": "truncated"} event."""
+    nfa_dict = thompson_construct_nfa(parse_tokens_to_ast(regex_to_tokens(regex)))
+    return _bounded(NFAtoDFAConverter(nfa_dict).iter_construct(), max_states)
+
+def _bounded(events, max_states):
+    states = 0
+    for ev in events:
+        if ev["type"] == "state":
+            states += 1
+            if states > max_states:
+                events.close()  # stops the subset construction
+                yield {"type": "truncated", "states": max_states}
+                return
+        yield ev
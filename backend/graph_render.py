@@ -1,15 +1,198 @@
 import json
 import os
 
+from regex_to_nfa import ANY_SYMBOL
+
+# Level-of-detail thresholds (number of states). Small automata get the full
+# 'dot' layout, medium ones a cheaper force-directed engine, large ones a
+# summarized view (SCCs clustered, dead states collapsed) and anything bigger
+# is not drawn at all - only the JSON is written. A summary that is still
+# larger than SUMMARY_STATES is not drawn either.
+FAST_LAYOUT_STATES = int(os.environ.get('RENDER_FAST_LAYOUT_STATES', 80))
+SUMMARY_STATES = int(os.environ.get('RENDER_SUMMARY_STATES', 250))
+SKIP_RENDER_STATES = int(os.environ.get('RENDER_SKIP_STATES', 1000))
+FAST_ENGINE = os.environ.get('RENDER_FAST_ENGINE', 'sfdp')
+
+DEAD_NODE = 'dead'
+
 def save_json(obj: dict, filename: str):
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     with open(filename, "w", encoding="utf-8") as f:
         json.dump(obj, f, indent=2)
 
-def render_png(fa_dict: dict, out_path: str, kind: str = 'nfa'):
+def _runnable(ch: str) -> bool:
+    # only [0-9A-Za-z] collapse into ranges; a run can't cross between classes
+    # because the code points in between (':', '@', '[' ...) are not runnable
+    return len(ch) == 1 and ch.isascii() and ch.isalnum()
+
+def _show_symbol(sym: str) -> str:
+    # the label separators need quoting when they are symbols themselves
+    return f"'{sym}'" if sym in (',', '-') else sym
+
+def _edge_label(symbols, kind: str = 'nfa') -> str:
+    """Compact label for a set of symbols, e.g. {a,b,c,d,x} -> 'a-d,x'.
+    ANY_SYMBOL ('.') reads 'any' in an NFA but 'other' in a DFA, where it only
+    covers symbols that have no explicit edge of their own.
+    """
+    eps = 'epsilon' in symbols
+    chars = sorted(s for s in symbols if s not in ('epsilon', ANY_SYMBOL))
+    parts = ['ε'] if eps else []
+    i = 0
+    while i < len(chars):
+        j = i
+        while (j + 1 < len(chars) and _runnable(chars[j]) and _runnable(chars[j + 1])
+               and ord(chars[j + 1]) == ord(chars[j]) + 1):
+            j += 1
+        if j - i >= 2:
+            parts.append(f"{chars[i]}-{chars[j]}")
+        else:
+            parts.extend(_show_symbol(c) for c in chars[i:j + 1])
+        i = j + 1
+    if ANY_SYMBOL in symbols:
+        parts.append('other' if kind == 'dfa' else 'any')
+    return ','.join(parts)
+
+def _collect_edges(fa_dict: dict) -> dict:
+    """Merge parallel edges: (src, dst) -> set of symbols. Works for NFA and DFA dicts."""
+    edges = {}
+    for key, data in fa_dict.items():
+        if key == 'startingState':
+            continue
+        for symbol, nxt in data.items():
+            if symbol == 'isTerminatingState':
+                continue
+            targets = nxt if isinstance(nxt, list) else [nxt]  # NFA lists, DFA single state
+            for target in targets:
+                edges.setdefault((key, target), set()).add(symbol)
+    return edges
+
+def _dead_states(states, accepting, edges) -> set:
+    """States from which no accepting state is reachable."""
+    preds = {}
+    for (src, dst) in edges:
+        preds.setdefault(dst, set()).add(src)
+    alive = set(accepting)
+    stack = list(accepting)
+    while stack:
+        s = stack.pop()
+        for p in preds.get(s, ()):
+            if p not in alive:
+                alive.add(p)
+                stack.append(p)
+    return set(states) - alive
+
+def _strongly_connected_components(nodes, edges) -> list:
+    """Iterative Tarjan; returns a list of sets of nodes."""
+    succ = {}
+    for (src, dst) in edges:
+        succ.setdefault(src, []).append(dst)
+    index, low, on_stack = {}, {}, set()
+    stack, sccs = [], []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(succ.get(root, ())))]
+        index[root] = low[root] = counter; counter += 1
+        stack.append(root); on_stack.add(root)
+        while work:
+            node, it = work[-1]
+            advanced = False
+            for nxt in it:
+                if nxt not in index:
+                    index[nxt] = low[nxt] = counter; counter += 1
+                    stack.append(nxt); on_stack.add(nxt)
+                    work.append((nxt, iter(succ.get(nxt, ()))))
+                    advanced = True
+                    break
+                elif nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                comp = set()
+                while True:
+                    w = stack.pop(); on_stack.discard(w)
+                    comp.add(w)
+                    if w == node:
+                        break
+                sccs.append(comp)
+    return sccs
+
+def _summarize(states, accepting, start, edges):
+    """Collapse dead states into one node and every multi-state SCC into one node.
+    Returns (nodes, edges, start) where nodes maps id -> (label, accepting).
+    """
+    dead = _dead_states(states, accepting, edges)
+    live = [s for s in states if s not in dead]
+    live_edges = {k: v for k, v in edges.items() if k[0] not in dead and k[1] not in dead}
+
+    rep = {}
+    nodes = {}
+    for i, comp in enumerate(_strongly_connected_components(live, live_edges)):
+        if len(comp) == 1:
+            (st,) = comp
+            rep[st] = st
+            nodes[st] = (st, st in accepting)
+        else:
+            cid = f"scc{i}"
+            for st in comp:
+                rep[st] = cid
+            nodes[cid] = (f"{len(comp)} states", any(st in accepting for st in comp))
+    if dead:
+        for st in dead:
+            rep[st] = DEAD_NODE
+        nodes[DEAD_NODE] = ('∅', False)
+
+    merged = {}
+    for (src, dst), symbols in edges.items():
+        key = (rep[src], rep[dst])
+        if key == (DEAD_NODE, DEAD_NODE):
+            continue
+        merged.setdefault(key, set()).update(symbols)
+    return nodes, merged, rep.get(start)
+
+def choose_level(n_states: int) -> str:
+    if n_states > SKIP_RENDER_STATES:
+        return 'skipped'
+    if n_states > SUMMARY_STATES:
+        return 'summary'
+    if n_states > FAST_LAYOUT_STATES:
+        return 'fast'
+    return 'full'
+
+def render_png(fa_dict: dict, out_path: str, kind: str = 'nfa') -> dict:
     """Render finite automata dict to PNG using graphviz (if available).
     kind: 'nfa' or 'dfa'
+    Detail adapts to size (see the thresholds above); returns a dict describing
+    what was rendered: level, engine, states, edges and rendered (bool).
     """
+    start = fa_dict.get('startingState')
+    states = [k for k in fa_dict if k != 'startingState']
+    accepting = {k for k in states if fa_dict[k].get('isTerminatingState')}
+    edges = _collect_edges(fa_dict)
+
+    level = choose_level(len(states))
+    info = {"level": level, "engine": None, "states": len(states), "edges": len(edges), "rendered": False}
+    if level == 'skipped':
+        return info
+
+    if level == 'summary':
+        nodes, edges, start = _summarize(states, accepting, start, edges)
+        if len(nodes) > SUMMARY_STATES:
+            # acyclic automata barely shrink (every SCC is a single state), so
+            # the summary would be as big and slow as the full graph
+            info.update(level='skipped', summary_states=len(nodes))
+            return info
+    else:
+        nodes = {st: (st, st in accepting) for st in states}
+    engine = 'dot' if len(nodes) <= FAST_LAYOUT_STATES else FAST_ENGINE
+    info.update(engine=engine, drawn_states=len(nodes), drawn_edges=len(edges))
+
     try:
         import graphviz
     except Exception as e:
@@ -17,34 +200,26 @@ def render_png(fa_dict: dict, out_path: str, kind: str = 'nfa'):
         txt = out_path.rsplit('.', 1)[0] + ".txt"
         with open(txt, "w", encoding="utf-8") as f:
             f.write("Graphviz not installed. Expected to render: " + os.path.basename(out_path))
-        return
+        return info
 
-    dot = graphviz.Digraph(comment=kind.upper())
+    dot = graphviz.Digraph(comment=kind.upper(), engine=engine)
+    if engine != 'dot':
+        dot.attr(overlap='false', splines='true')
 
     # invisible starting helper
     dot.node('startingStateH', 'startingStateH', style='invis')
 
     # nodes
-    start = fa_dict.get('startingState')
-    for key, data in fa_dict.items():
-        if key == 'startingState':
-            continue
-        shape = 'doublecircle' if data.get('isTerminatingState') else 'circle'
-        dot.node(key, key, shape=shape)
+    for key, (label, is_final) in nodes.items():
+        shape = 'doublecircle' if is_final else 'circle'
+        if key.startswith('scc') or key == DEAD_NODE:
+            dot.node(key, label, shape=shape, style='filled', fillcolor='lightgrey')
+        else:
+            dot.node(key, label, shape=shape)
 
-    # edges
-    for key, data in fa_dict.items():
-        if key == 'startingState':
-            continue
-        for symbol, nxt in data.items():
-            if symbol == 'isTerminatingState':
-                continue
-            if isinstance(nxt, list):  # NFA
-                for target in nxt:
-                    label = 'ε' if symbol == 'epsilon' else symbol
-                    dot.edge(key, target, label=label)
-            else:  # DFA
-                dot.edge(key, nxt, label=symbol)
+    # edges (parallel edges merged into one labelled with the symbol set)
+    for (src, dst), symbols in edges.items():
+        dot.edge(src, dst, label=_edge_label(symbols, kind))
 
     if start is not None:
         dot.edge('startingStateH', start)
@@ -52,3 +227,5 @@ def render_png(fa_dict: dict, out_path: str, kind: str = 'nfa'):
     os.makedirs(os.path.dirname(out_path), exist_ok=True)
     dot.format = 'png'
     dot.render(out_path, cleanup=True)
+    info["rendered"] = True
+    return info
@@ -1,13 +1,20 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template
+import json
 from uuid import uuid4
 import os
-from convert import process_regex
+from convert import process_regex, stream_dfa
+from regex_to_nfa import normalize_regex
+from singleflight import SingleFlight
 
 # Use the project root (one folder up) as the templates folder so
 # render_template("index.html") will find index.html located at the repo root.
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 app = Flask(__name__, template_folder=BASE_DIR)
 
+# Identical regexes submitted at the same time (e.g. a whole class pasting the
+# same exercise) share one conversion instead of each running their own.
+inflight = SingleFlight()
+
 
 # Simple CORS support so the frontend (served by Vite) can call this API in
 # development without installing extra packages. If you prefer, install
@@ -26,16 +33,52 @@ def convert_endpoint():
     if not regex:
         return jsonify({"error": "Missing 'regex' in request body"}), 400
 
-    uid = str(uuid4())
     try:
-        result = process_regex(regex, uid)
+        result = inflight.do(normalize_regex(regex), lambda: process_regex(regex, str(uuid4())))
+        # the shared result carries the leader's spelling; echo this caller's own
+        result = {**result, "regex": regex}
         return jsonify(result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 
+# Streams the first STREAM_MAX_STATES states of the DFA, one event per
+# discovered state/transition, ending with a "done" or "truncated" event.
+# NDJSON by default, SSE with ?format=sse or "Accept: text/event-stream";
+# GET /convert/stream?regex=...&format=sse is what an EventSource uses. The
+# server closes the stream after the last event, so an EventSource client must
+# call close() on "done"/"truncated" or it will reconnect and start over.
+# Like /convert, identical concurrent requests share one (bounded) construction.
+@app.route('/convert/stream', methods=['GET', 'POST'])
+def convert_stream_endpoint():
+    if request.method == 'GET':
+        regex = request.args.get('regex', '').strip()
+    else:
+        data = request.get_json(silent=True) or {}
+        regex = data.get('regex', '').strip()
+    if not regex:
+        return jsonify({"error": "Missing 'regex' in request body"}), 400
+
+    try:
+        events = inflight.do('stream:' + normalize_regex(regex), lambda: list(stream_dfa(regex)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    sse = request.args.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+    if sse:
+        body = (f"event: {ev['type']}\ndata: {json.dumps(ev)}\n\n" for ev in events)
+        return Response(body, mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+    body = (json.dumps(ev) + "\n" for ev in events)
+    return Response(body, mimetype='application/x-ndjson')
+
+
+@app.get('/metrics')
+def metrics_endpoint():
+    return jsonify({"convert_inflight": inflight.metrics()}), 200
+
 
 @app.route('/convert', methods=['OPTIONS'])
+@app.route('/convert/stream', methods=['OPTIONS'])
 def convert_options():
     # Reply to preflight CORS requests
     return ('', 204)
@@ -1,5 +1,16 @@
 # NFA → DFA conversion and DFA serialization
 
+import atexit
+import multiprocessing
+import os
+import pickle
+import tempfile
+import threading
+from collections import deque
+from itertools import chain
+
+from regex_to_nfa import ANY_SYMBOL
+
 class DFA:
     def __init__(self, alphabet, states, start_state, accept_states, transition_function):
         self.alphabet = alphabet              # set[str] -- set of symbols the DFA accepts
@@ -13,7 +24,11 @@ class DFA:
     def run(self, input_string: str) -> bool:   #running a dfa to see if we can reach any accepting state for a string
         current_state = self.start_state
         for symbol in input_string:
-            current_state = self.transition_function[current_state][symbol]
+            if symbol not in self.alphabet:     #a symbol not listed explicitly is covered by '.' (if any)
+                symbol = ANY_SYMBOL
+            current_state = self.transition_function.get(current_state, {}).get(symbol)
+            if current_state is None:   #no transition at all.. string is rejected
+                return False
         return current_state in self.accept_states
 
     def _num(self, state: str) -> str:  #assigning an id to state or getting id of a pre-existing state
@@ -23,6 +38,7 @@ class DFA:
         return str(self._name_map[state])
 
     def to_dict(self) -> dict:      #serializes the DFA into a JSON-like structure.
+        #a transition on ANY_SYMBOL ("any", from '.') means "any symbol that has no explicit transition from this state"
         dfa_dict = {'startingState': self._num(self.start_state)}
         for state in self.states:
             if state == 'frozenset()':
@@ -47,12 +63,17 @@ class NFAtoDFAConverter:
     
     # For every state q ∈ S, collect all NFA transitions on symbol a
     #Move(S, a) = union of all destinations q --a--> ?
+    #'.' transitions (ANY_SYMBOL) match every symbol.. so they are followed for concrete symbols too,
+    #while ANY_SYMBOL itself stands for "every symbol not in the alphabet"
     def move(self, states, symbol):
         out = set()
         for s in states:
             if s in self.nfa:
                 for nxt in self.nfa[s].get(symbol, []):
                     out.add(nxt)
+                if symbol != ANY_SYMBOL:
+                    for nxt in self.nfa[s].get(ANY_SYMBOL, []):
+                        out.add(nxt)
         return frozenset(out)
 
     # Because NFA may later go through ε-moves, take ε-closure:
@@ -73,7 +94,7 @@ class NFAtoDFAConverter:
     # This new set of states becomes a new DFA state, if not already created.
 
 
-    def convert(self) -> DFA:
+    def _alphabet(self):
         alphabet = set()
         for state_dict in self.nfa.values(): #nfa is stored as a dictionary.. so nfa.values gives starting state and dictionaries of transitions from each state..
             #"S1",
@@ -84,43 +105,225 @@ class NFAtoDFAConverter:
                 for sym in state_dict.keys():
                     if sym not in ("epsilon", "isTerminatingState"):
                         alphabet.add(sym)   #adding only symbols to alphabet
+        return alphabet
 
+    def _is_accepting(self, states):
+        #if any of the participating state is final in NFA.. it will be final of DFA too
+        return any((s in self.nfa and self.nfa[s].get('isTerminatingState', False)) for s in states)
+
+    def _explore(self, alphabet):
+        #BFS over DFA states (epsilon closures).. yields (curr, sym, next, is_new) for every transition as soon as it is found
         start = self.epsilon_closure([self.nfa['startingState']]) #epsilon closure of starting state
+        seen = {start}
+        queue = deque([start])
+        yield None, None, start, True
+        while queue:
+            curr = queue.popleft()
+            for sym in alphabet:
+                #finding all nodes reachable from current node using "sym" symbol.. including epsilon transitions
+                cl = self.epsilon_closure(self.move(curr, sym))
+                is_new = cl not in seen
+                if is_new:
+                    seen.add(cl)
+                    queue.append(cl)
+                yield curr, sym, cl, is_new
+
+    def iter_construct(self):
+        """Progressive subset construction: yields events in BFS order while the DFA is built.
+
+        {"type": "state", "id": "0", "isTerminatingState": False, "start": True}
+        {"type": "transition", "from": "0", "symbol": "a", "to": "1"}
+        {"type": "done", "states": 2}
+
+        A state's id never changes after it is emitted and matches DFA.to_dict() numbering.
+        The empty (dead) state is not emitted, just like in to_dict().
+        Closing the generator stops the construction.
+        """
+        ids = {}
+        for curr, sym, cl, is_new in self._explore(sorted(self._alphabet())):
+            if not cl:
+                continue    #dead state
+            if is_new:
+                ids[cl] = str(len(ids))
+                yield {"type": "state", "id": ids[cl], "isTerminatingState": self._is_accepting(cl), "start": curr is None}
+            if curr is not None:
+                yield {"type": "transition", "from": ids[curr], "symbol": sym, "to": ids[cl]}
+        yield {"type": "done", "states": len(ids)}
+
+    def convert(self) -> DFA:
+        alphabet = self._alphabet()
+
         #each epsilon closure becomes a dfa state .. till no new states are found
-        dfa_states = [start]    
+        names = {}      #frozenset -> its string name (computed once so equal sets always get the same name)
+        dfa_states = []
         #A DFA state S is accepting if: S contains any accepting NFA state
         dfa_accept_states = []
         dfa_tf = {}
-        # Add that DFA state to queue
-        queue = [start]
 
-        #continue till queue is empty .. ie no new state is found
-        while queue:
-            curr = queue.pop(0)
-            for sym in alphabet:
-                #finding all nodes reachable from current node using "sym" symbol.. including epsilon transitions
-                mv = self.move(curr, sym)
-                cl = self.epsilon_closure(mv)
+        for curr, sym, cl, is_new in self._explore(sorted(alphabet)):
+            #that becomes new dfa state
+            if is_new:
+                names[cl] = str(cl)
+                dfa_states.append(names[cl])
+                if self._is_accepting(cl):
+                    dfa_accept_states.append(names[cl])
+            if curr is None:
+                start_str = names[cl]
+                continue
+            #storing this new transiton for curr-> newly discovered node.. dfa_transition function
+            dfa_tf.setdefault(names[curr], {})[sym] = names[cl]
 
-                #that becomes new dfa state
-                if cl not in dfa_states:
-                    dfa_states.append(cl)
-                    queue.append(cl)
-                
-                #storing this new transiton for curr-> newly discovered node.. dfa_transition function
-                dfa_tf.setdefault(str(curr), {})
-                dfa_tf[str(curr)][sym] = str(cl)
-
-            #if any of the participating state is final in NFA.. it will be final of DFA too
-            if any((s in self.nfa and self.nfa[s].get('isTerminatingState', False)) for s in curr):
-                if str(curr) not in dfa_accept_states:
-                    dfa_accept_states.append(str(curr))
-
-        
-        #adding everything to DFA constructor
-        states_str = [str(s) for s in dfa_states]
-        start_str = str(start)
-        dfa_accept_states_str = [str(s) for s in dfa_accept_states]
-        dfa_tf_str = {str(k): {sym: str(v) for sym, v in trans.items()} for k, trans in dfa_tf.items()}
-
-        return DFA(alphabet, states_str, start_str, dfa_accept_states_str, dfa_tf_str)
+        return self._build_dfa(alphabet, dfa_states, start_str, dfa_accept_states, dfa_tf)
+
+    @staticmethod
+    def _build_dfa(alphabet, dfa_states, start_str, dfa_accept_states, dfa_tf) -> DFA:
+        dfa = DFA(alphabet, dfa_states, start_str, dfa_accept_states, dfa_tf)
+        #number states in discovery order (same ids iter_construct streams)
+        for name in dfa_states:
+            if name != 'frozenset()':
+                dfa._num(name)
+        return dfa
+
+
+# Parallel subset construction
+#
+# The DFA is explored level by level (a BFS frontier at a time). Once a frontier
+# is large enough it is split into chunks and expanded by a process pool; the
+# coordinator (this process) deduplicates the resulting state sets by hash and
+# builds the next frontier. Processing frontiers in order gives exactly the
+# sequential BFS order, so the resulting DFA (and its numbering) is the same as
+# NFAtoDFAConverter.convert().
+#
+# Each process expands states with a _StepTable built lazily from the read-only
+# NFA: a row is only made for NFA states that occur in a reached DFA state, and
+# a row holds references to the shared per-target ε-closures (never a union per
+# (q, sym)), so memory stays close to the closures that are actually needed.
+#
+# The pool is created once per process from a 'forkserver' (or 'spawn') context,
+# never by forking the threaded web server. Workers get the NFA through a pickle
+# file written once per conversion.
+
+class _StepTable:
+    def __init__(self, nfa: dict, symbols):
+        self.nfa = nfa
+        self.symbols = symbols
+        self._closures = {}     #NFA state -> ε-closure (frozenset), shared by every row
+        self._rows = {}         #NFA state -> tuple (per symbol) of tuples of closures
+
+    def closure(self, q):
+        cl = self._closures.get(q)
+        if cl is None:
+            seen = {q}
+            stack = [q]
+            while stack:
+                s = stack.pop()
+                for nxt in self.nfa.get(s, {}).get('epsilon', []):
+                    if nxt not in seen:
+                        seen.add(nxt)
+                        stack.append(nxt)
+            cl = self._closures[q] = frozenset(seen)
+        return cl
+
+    def row(self, q):
+        r = self._rows.get(q)
+        if r is None:
+            data = self.nfa.get(q, {})
+            any_targets = data.get(ANY_SYMBOL, [])
+            r = []
+            for sym in self.symbols:
+                targets = data.get(sym, []) if sym == ANY_SYMBOL else [*data.get(sym, []), *any_targets]
+                r.append(tuple(self.closure(t) for t in targets))
+            r = self._rows[q] = tuple(r)
+        return r
+
+    def expand(self, states):
+        #DFA transitions of the NFA-state set on every symbol (in self.symbols order)
+        out = [set() for _ in self.symbols]
+        for q in states:
+            for i, closures in enumerate(self.row(q)):
+                for cl in closures:
+                    out[i] |= cl
+        return tuple(frozenset(o) for o in out)
+
+
+_worker_table = None    #(nfa pickle path, _StepTable) of the conversion this worker last served
+
+def _expand_chunk(args):
+    global _worker_table
+    path, chunk = args
+    if _worker_table is None or _worker_table[0] != path:
+        with open(path, 'rb') as f:
+            nfa, symbols = pickle.load(f)
+        _worker_table = (path, _StepTable(nfa, symbols))
+    table = _worker_table[1]
+    return [table.expand(states) for states in chunk]
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(workers: int):
+    #one long-lived pool per worker count and process
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            pool = _pools[workers] = ctx.Pool(workers)
+        return pool
+
+@atexit.register
+def _close_pools():
+    for pool in _pools.values():
+        pool.terminate()
+
+
+class ParallelNFAtoDFAConverter(NFAtoDFAConverter):
+    def __init__(self, nfa: dict, workers: int = None, min_parallel_frontier: int = 1024, chunk_size: int = 256):
+        super().__init__(nfa)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_frontier = min_parallel_frontier  #smaller frontiers are expanded in-process (pool not worth it)
+        self.chunk_size = chunk_size
+
+    def convert(self) -> DFA:
+        alphabet = self._alphabet()
+        symbols = sorted(alphabet)
+        table = _StepTable(self.nfa, symbols)
+
+        start = self.epsilon_closure([self.nfa['startingState']])
+        names = {start: str(start)}
+        dfa_states = [names[start]]
+        dfa_accept_states = [names[start]] if self._is_accepting(start) else []
+        dfa_tf = {}
+
+        frontier = [start]
+        nfa_path = None
+        try:
+            while frontier:
+                if self.workers > 1 and len(frontier) >= self.min_parallel_frontier:
+                    if nfa_path is None:
+                        fd, nfa_path = tempfile.mkstemp(suffix='.nfa.pickle')
+                        with os.fdopen(fd, 'wb') as f:
+                            pickle.dump((self.nfa, symbols), f)
+                    chunks = [(nfa_path, frontier[i:i + self.chunk_size]) for i in range(0, len(frontier), self.chunk_size)]
+                    rows = chain.from_iterable(_get_pool(self.workers).imap(_expand_chunk, chunks))
+                else:
+                    rows = (table.expand(states) for states in frontier)
+
+                next_frontier = []
+                for curr, row in zip(frontier, rows):
+                    src = dfa_tf.setdefault(names[curr], {})
+                    for sym, nxt in zip(symbols, row):
+                        if nxt not in names:    #new DFA state (dedup by hash of the NFA state set)
+                            names[nxt] = str(nxt)
+                            dfa_states.append(names[nxt])
+                            if self._is_accepting(nxt):
+                                dfa_accept_states.append(names[nxt])
+                            next_frontier.append(nxt)
+                        src[sym] = names[nxt]
+                frontier = next_frontier
+        finally:
+            if nfa_path is not None:
+                os.unlink(nfa_path)
+
+        return self._build_dfa(alphabet, dfa_states, names[start], dfa_accept_states, dfa_tf)
@@ -12,6 +12,9 @@ class TokenType(Enum):   #Creating enum ... each member is represented by a cons
     OPEN_SQUARE_BRACKET = auto()
     CLOSED_SQUARE_BRACKET = auto()
     DASH = auto()
+    DOT = auto()
+    OPEN_CURLY_BRACKET = auto()
+    CLOSED_CURLY_BRACKET = auto()
     LITERAL = auto()
 
 def getTypeToken(ch: str) -> TokenType:  #returns TokenType for each character .. argument is a character.. not string
@@ -24,6 +27,9 @@ def getTypeToken(ch: str) -> TokenType:  #returns TokenType for each character .
     elif ch == '[': return TokenType.OPEN_SQUARE_BRACKET
     elif ch == ']': return TokenType.CLOSED_SQUARE_BRACKET
     elif ch == '-': return TokenType.DASH
+    elif ch == '.': return TokenType.DOT
+    elif ch == '{': return TokenType.OPEN_CURLY_BRACKET
+    elif ch == '}': return TokenType.CLOSED_CURLY_BRACKET
     else: return TokenType.LITERAL
 
 def getTokenValue(ttype: TokenType):   #get corresponding regex operator wrt TokenType Enum.. opposite of above function
@@ -37,6 +43,9 @@ def getTokenValue(ttype: TokenType):   #get corresponding regex operator wrt Tok
         TokenType.OPEN_SQUARE_BRACKET: '[',
         TokenType.CLOSED_SQUARE_BRACKET: ']',
         TokenType.DASH: '-',
+        TokenType.DOT: '.',
+        TokenType.OPEN_CURLY_BRACKET: '{',
+        TokenType.CLOSED_CURLY_BRACKET: '}',
     }
     return mapping.get(ttype, ttype)       #dict.get(key,default)... default is written in case of TokenType.literal
 
@@ -52,7 +61,19 @@ class regexLexer:       #Entire string is stored as attribute: regexStr and has
     def __init__(self, regexStr: str):   
         self.regexStr = regexStr
     def lexer(self):
-        return [Token(getTypeToken(ch), ch) for ch in self.regexStr]   
+        tokens = []
+        i = 0
+        while i < len(self.regexStr):
+            ch = self.regexStr[i]
+            if ch == '\\':    #escape: next character is always a literal (\. \* \{ \\ ...)
+                if i + 1 == len(self.regexStr):
+                    raise Exception("Dangling escape at end of regex")
+                tokens.append(Token(TokenType.LITERAL, self.regexStr[i + 1]))
+                i += 2
+                continue
+            tokens.append(Token(getTypeToken(ch), ch))
+            i += 1
+        return tokens
         #returns a list of objects of Token class represented each character of regex
 
 
@@ -89,6 +110,12 @@ class LiteralCharacterAstNode(AstNode):
 class SquareBracketAstNode(AstNode):
     def __init__(self, clas): self.clas = clas       #set of chars  #(self, clas: set) also possible
 
+class DotAstNode(AstNode):          #'.' .. any character, kept as ONE symbol (ANY_SYMBOL) instead of a huge set
+    def __init__(self): pass
+
+class RepeatAstNode(AstNode):       #a{m,n} .. high=None means unbounded a{m,}
+    def __init__(self, left, low, high): self.left, self.low, self.high = left, low, high
+
 
 #Recursive Function for printing the AST... indent is used for making tree look better 
 def print_ast(node, indent=0):
@@ -108,6 +135,10 @@ def print_ast(node, indent=0):
     elif isinstance(node, SquareBracketAstNode):
         print(pad + 'SQUARE_BRACKET')
         for ch in sorted(node.clas): print(' '*(indent+2) + f'CHARACTER: {ch}')
+    elif isinstance(node, DotAstNode):
+        print(pad + 'DOT')
+    elif isinstance(node, RepeatAstNode):
+        print(pad + f"REPEAT {{{node.low},{'' if node.high is None else node.high}}}"); print_ast(node.left, indent+2)
     else:
         raise ValueError('Invalid AST node type')
     
@@ -172,7 +203,7 @@ class ParseRegex:
         ast = self.parse_C()  #For a term, Parse that particular component first
         if self.currToken < len(self.tokenStream):  #if a token is left
             ttype = self.tokenStream[self.currToken].ttype    #get the type of that token
-            if ttype in (TokenType.LITERAL, TokenType.OPEN_PAREN, TokenType.OPEN_SQUARE_BRACKET):
+            if ttype in (TokenType.LITERAL, TokenType.DOT, TokenType.OPEN_PAREN, TokenType.OPEN_SQUARE_BRACKET):
                 #if the token is a literal, [, (... then it means it is a sequence.
                 left = ast  #current parsed component becomes left child
                 right = self.parse_T()     #next parsed Term becomes right child
@@ -183,6 +214,8 @@ class ParseRegex:
         if self.match(TokenType.LITERAL):   #if current component is a literal
             ast = LiteralCharacterAstNode(self.tokenStream[self.currToken - 1].content)
             #create a literal node for that literal.. (-1) because match increments the index
+        elif self.match(TokenType.DOT):
+            ast = DotAstNode()
         elif self.match(TokenType.OPEN_PAREN): 
             #if current token is (... parse the expression inside it
             ast = self.parse_E()
@@ -204,8 +237,29 @@ class ParseRegex:
             ast = PlusAstNode(ast)
         elif self.match(TokenType.QUESTION_MARK):
             ast = QuestionMarkAstNode(ast)
+        elif self.match(TokenType.OPEN_CURLY_BRACKET):
+            low, high = self.parse_R()
+            ast = RepeatAstNode(ast, low, high)
         return ast
 
+    #parsing a bounded repetition {m}, {m,} or {m,n} .. the '{' is already matched
+    def parse_R(self):
+        text = ''
+        while self.currToken < len(self.tokenStream) and self.tokenStream[self.currToken].ttype == TokenType.LITERAL:
+            text += self.tokenStream[self.currToken].content
+            self.currToken += 1
+        self.expect(TokenType.CLOSED_CURLY_BRACKET)
+        low, sep, high = text.partition(',')
+        if not low.isdigit() or (high and not high.isdigit()):
+            raise Exception("Invalid repetition", '{' + text + '}')
+        low = int(low)
+        high = (None if sep else low) if not high else int(high)
+        if high is not None and high < low:
+            raise Exception("Invalid repetition", '{' + text + '}')
+        if max(low, high or 0) > MAX_REPEAT:
+            raise Exception("Repetition count too large", MAX_REPEAT)
+        return low, high
+
     #finally parsing a literal
     def parse_L(self):
         clas = set()    #a set of possible values
@@ -214,8 +268,8 @@ class ParseRegex:
             ttype = self.tokenStream[self.currToken].ttype
             if ttype == TokenType.CLOSED_SQUARE_BRACKET: 
                 break      #sequence has ended if ] is encountered so stop
-            elif ttype == TokenType.LITERAL:
-                ch = self.tokenStream[self.currToken].content
+            elif ttype in (TokenType.LITERAL, TokenType.DOT, TokenType.OPEN_CURLY_BRACKET, TokenType.CLOSED_CURLY_BRACKET):
+                ch = self.tokenStream[self.currToken].content   #no special meaning inside [ ]
                 clas.add(ch); que.append(ch)    #add that character to possible set(clas) and queue
             elif ttype == TokenType.DASH:
                 #if it is a dash .. two possibilities .. dash is a literal.. dash is an operator
@@ -245,6 +299,10 @@ class ParseRegex:
 
 #  Thompson (AST to NFA) 
 
+ANY_SYMBOL = 'any'      #transition symbol used for '.'.. in the DFA it means "any symbol not listed explicitly"
+MAX_REPEAT = 1000       #upper limit for m and n in {m,n}
+MAX_NFA_STATES = 20000  #upper limit for the whole NFA.. nested repeats multiply: (a{1000}){1000}
+
 """
 Example for NFA:
 {
@@ -292,72 +350,146 @@ class NFA:
         return nfa_dict
 
 class ThompsonConstruction:
-    def __init__(self, ast): self.ast = ast
+    #All fragments write into ONE shared state table (self.states) instead of returning dicts
+    #that get merged at every node.. so construction is linear in the size of the NFA.
+    def __init__(self, ast):
+        self.ast = ast
+        self.states = {}    #state -> {symbol: set(next states)}.. insertion order = creation order
+        self.order = []     #states in creation order.. a fragment is a contiguous slice of this list
 
     def construct(self):
-        s, f, states = self._construct_from_ast(self.ast)
-        return NFA(s, f, states)
+        s, f = self._construct_from_ast(self.ast)
+        return NFA(s, f, self.states)
+
+    def _reserve(self, n):
+        #fail before building anything that would push the NFA over the limit
+        if len(self.order) + n > MAX_NFA_STATES:
+            raise Exception("Regex expands to too many states", MAX_NFA_STATES)
+
+    def _new_state(self):
+        self._reserve(1)
+        st = object()       #unique state
+        self.states[st] = {}
+        self.order.append(st)
+        return st
+
+    def _add(self, src, symbol, dst):
+        self.states[src].setdefault(symbol, set()).add(dst)
+
+    def _clone(self, frag, s, f):
+        #copy an already built fragment (a slice of self.order) with fresh states.. no AST re-walk
+        mapping = {st: object() for st in frag}
+        for st in frag:
+            new = mapping[st]
+            self.states[new] = {sym: {mapping[n] for n in nxt} for sym, nxt in self.states[st].items()}
+            self.order.append(new)
+        return mapping[s], mapping[f]
 
     def _construct_from_ast(self, node):
         if isinstance(node, LiteralCharacterAstNode):
             # start --a--> final
-            s = object(); f = object()      # s=start state.... f=final state (both are diff unique objects)
-            return s, f, {s: {node.char: {f}}, f: {'': set()}}     # s --char--> f
-            #returns start,final and states.. {start --char--> final, final --epsilon--> empty set}
+            s = self._new_state(); f = self._new_state()      # s=start state.... f=final state (both are diff unique objects)
+            self._add(s, node.char, f)      # s --char--> f
+            return s, f
+
+        elif isinstance(node, DotAstNode):
+            # start --any--> final   (one symbol, not one edge per character)
+            s = self._new_state(); f = self._new_state()
+            self._add(s, ANY_SYMBOL, f)
+            return s, f
 
         elif isinstance(node, PlusAstNode):     #A+
             # start --epsilon--> a --epsilon--> final
             #       <--epsilon--
-            sub_s, sub_f, sub_states = self._construct_from_ast(node.left)  #build nfa for A
-            s = object(); f = object()  #unique start and final states
-            states = { s: {'': {sub_s}}, **sub_states, sub_f: {'': {s, f}}, f: {'': set()} }
-            # {start --epsilon--> a's start, all transitions from A NFA, from final state of A's NFA --epsilon--> start&final, final--epsilon--> empty set}
-            return s, f, states
+            s = self._new_state()  #unique start and final states
+            sub_s, sub_f = self._construct_from_ast(node.left)  #build nfa for A
+            f = self._new_state()
+            self._add(s, '', sub_s)
+            self._add(sub_f, '', s); self._add(sub_f, '', f)
+            # {start --epsilon--> a's start, from final state of A's NFA --epsilon--> start&final}
+            return s, f
 
         elif isinstance(node, QuestionMarkAstNode):  #A?
             # start --epsilon--> a --epsilon--> final
             #      ------------epsilon--------->
-            sub_s, sub_f, sub_states = self._construct_from_ast(node.left) #build nfa for A
-            s = object(); f = object()
-            states = { s: {'': {sub_s, f}}, **sub_states, sub_f: {'': {f}}, f: {'': set()} }
-            #{start--epsilon--> start of A's NFA or final(select once or never), all Transitions of A's NFA, final state of A's NFA--epsilon-->final, final--epsilon--> empty set}
-            return s, f, states
+            s = self._new_state()
+            sub_s, sub_f = self._construct_from_ast(node.left) #build nfa for A
+            f = self._new_state()
+            self._add(s, '', sub_s); self._add(s, '', f)
+            self._add(sub_f, '', f)
+            #{start--epsilon--> start of A's NFA or final(select once or never), final state of A's NFA--epsilon-->final}
+            return s, f
 
         elif isinstance(node, SeqAstNode): #ab
             # a --epsilon--> b
-            l_s, l_f, l_states = self._construct_from_ast(node.left) #a's NFA
-            r_s, r_f, r_states = self._construct_from_ast(node.right) #b's NFA
-            states = { **l_states, **r_states, l_f: {'': {r_s}} }
-            # all transitions of A , B, final state of A --epsilon--> final state of B
-            return l_s, r_f, states
+            l_s, l_f = self._construct_from_ast(node.left) #a's NFA
+            r_s, r_f = self._construct_from_ast(node.right) #b's NFA
+            self._add(l_f, '', r_s)
+            # final state of A --epsilon--> start state of B
+            return l_s, r_f
 
         elif isinstance(node, OrAstNode): #a|b 
             # start --epsilon--> a --epsilon--> final
             #       --epsilon--> b --epsilon-->
-            l_s, l_f, l_states = self._construct_from_ast(node.left)
-            r_s, r_f, r_states = self._construct_from_ast(node.right)
-            s = object(); f = object()
-            states = { s: {'': {l_s, r_s}}, **l_states, **r_states, l_f: {'': {f}}, r_f: {'': {f}}, f: {'': set()} }
-            #all above states added
-            return s, f, states
+            s = self._new_state()
+            l_s, l_f = self._construct_from_ast(node.left)
+            r_s, r_f = self._construct_from_ast(node.right)
+            f = self._new_state()
+            self._add(s, '', l_s); self._add(s, '', r_s)
+            self._add(l_f, '', f); self._add(r_f, '', f)
+            return s, f
 
         elif isinstance(node, StarAstNode): #a*
             #      -----------epsilon------------>
             # start --epsilon--> a --epsilon--> final
             #       <--epsilon--
-            sub_s, sub_f, sub_states = self._construct_from_ast(node.left)
-            s = object(); f = object()
-            states = { s: {'': {sub_s, f}}, **sub_states, sub_f: {'': {s, f}}, f: {'': set()} }
-            #all above states added
-            return s, f, states
+            s = self._new_state()
+            sub_s, sub_f = self._construct_from_ast(node.left)
+            f = self._new_state()
+            self._add(s, '', sub_s); self._add(s, '', f)
+            self._add(sub_f, '', s); self._add(sub_f, '', f)
+            return s, f
 
         elif isinstance(node, SquareBracketAstNode): #[abc]
             # start--a--> final
             #      --b-->
             #      --c-->
-            s = object(); f = object()
-            states = { s: {ch: {f} for ch in node.clas}, f: {'': set()} }
-            return s, f, states
+            s = self._new_state(); f = self._new_state()
+            for ch in node.clas:
+                self._add(s, ch, f)
+            return s, f
+
+        elif isinstance(node, RepeatAstNode): #a{m,n}
+            # start -> a -> a -> ... (m times) -> a? -> a? ... (n-m times) -> final
+            # for a{m,} the tail is a* instead.. A is built ONCE, the other copies are clones of it
+            s = self._new_state()
+            begin = len(self.order)
+            sub_s, sub_f = self._construct_from_ast(node.left)
+            frag = self.order[begin:]
+
+            copies = node.low + 1 if node.high is None else node.high
+            if copies == 0:     #a{0} / a{0,0} only matches the empty string
+                for st in frag:
+                    del self.states[st]
+                del self.order[begin:]
+                f = self._new_state()
+                self._add(s, '', f)
+                return s, f
+
+            self._reserve(len(frag) * (copies - 1) + 1)
+            #clone before wiring anything.. so every copy is a clean copy of A alone
+            parts = [(sub_s, sub_f)] + [self._clone(frag, sub_s, sub_f) for _ in range(copies - 1)]
+            f = self._new_state()
+            prev = s
+            for i, (c_s, c_f) in enumerate(parts):
+                self._add(prev, '', c_s)
+                if i >= node.low:       #optional copy.. may skip straight to final
+                    self._add(prev, '', f)
+                    if node.high is None:   #unbounded tail: loop back on the last copy
+                        self._add(c_f, '', c_s)
+                prev = c_f
+            self._add(prev, '', f)
+            return s, f
 
         else:
             raise ValueError("Unknown AST node type in Thompson construction")
@@ -366,6 +498,21 @@ class ThompsonConstruction:
 def regex_to_tokens(regex: str):
     return regexLexer(regex).lexer()
 
+def normalize_regex(regex: str) -> str:
+    #canonical spelling of a regex: same tokens -> same string (\\a and a are both LITERAL 'a')
+    #used as a cache/coalescing key.. an invalid regex is returned unchanged
+    try:
+        tokens = regex_to_tokens(regex)
+    except Exception:
+        return regex
+    out = []
+    for tok in tokens:
+        if tok.ttype == TokenType.LITERAL and (getTypeToken(tok.content) != TokenType.LITERAL or tok.content == '\\'):
+            out.append('\\' + tok.content)     #literal that would otherwise be an operator keeps its escape
+        else:
+            out.append(tok.content)
+    return ''.join(out)
+
 def parse_tokens_to_ast(tokens):
     return ParseRegex(tokens).parse()
 
@@ -0,0 +1,171 @@
+# Request coalescing ("single-flight") for identical concurrent conversions.
+#
+# Inside one worker, threads asking for the same key attach to the call that is
+# already running and get its result. Across workers (e.g. gunicorn -w N) the
+# leader of each process takes an flock on a per-key lock file; whoever gets it
+# computes and writes the result next to the lock, the others block on the lock
+# and then pick up that result instead of computing it again.
+#
+# Lock/result files live in the app's own directory (one set per deployment).
+# Files older than RESULT_TTL are pruned by leaders; unlinking a lock file that
+# someone is about to open can at worst cause one duplicate computation.
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:     # no flock (Windows) -> coalesce within the process only
+    fcntl = None
+
+RESULT_TTL = 300        # seconds a lock/result file may sit unused before it is pruned
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0        # requests attached to this call besides the leader
+        self.on_peer = False    # leader is blocked in flock behind another worker
+
+
+class SingleFlight:
+    def __init__(self, lock_dir: str = None):
+        self.lock_dir = lock_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.inflight')
+        self._lock = threading.Lock()
+        self._calls = {}        # key -> _Call currently running in this process
+        self._stats = {"computed": 0, "coalesced": 0, "cross_process_hits": 0}
+        self._last_prune = 0.0
+
+    def do(self, key: str, fn):
+        """Run fn() once per key at a time and hand its result to every concurrent caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run_across_processes(key, fn, call)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def metrics(self) -> dict:
+        """Counters for THIS worker process. 'waiters' are requests attached to a
+        call running here; 'cross_process_waiters' are requests here that wait on
+        another worker's computation (sum over workers for the host-wide figure)."""
+        with self._lock:
+            return {
+                **self._stats,
+                "in_flight": len(self._calls),
+                "waiters": sum(c.waiters for c in self._calls.values()),
+                "cross_process_waiters": sum(1 + c.waiters for c in self._calls.values() if c.on_peer),
+            }
+
+    def _run_across_processes(self, key: str, fn, call: _Call):
+        if fcntl is None:
+            return self._compute(fn)
+
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        lock_path = os.path.join(self.lock_dir, name + '.lock')
+        result_path = os.path.join(self.lock_dir, name + '.json')
+        started = time.time()
+
+        try:
+            os.makedirs(self.lock_dir, exist_ok=True)
+            lock_file = open(lock_path, 'a')
+        except OSError:
+            # e.g. read-only app directory: coalescing is an optimisation and
+            # must never fail the request, so just compute in this process
+            return self._compute(fn)
+
+        with lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # another worker is computing this key: wait for it, then reuse its result
+                call.on_peer = True
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                finally:
+                    call.on_peer = False
+                shared = self._read_result(result_path, started)
+                if shared is not None:
+                    with self._lock:
+                        self._stats["cross_process_hits"] += 1
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                    return shared
+            try:
+                result = self._compute(fn)
+                try:
+                    self._write_result(result_path, result)
+                except OSError:
+                    pass    # waiting workers will compute it themselves
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        self._prune()
+        return result
+
+    def _prune(self):
+        # at most once per RESULT_TTL per process; results are only needed by
+        # workers that were already blocked on the lock when they were written
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < RESULT_TTL:
+                return
+            self._last_prune = now
+        try:
+            names = os.listdir(self.lock_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.lock_dir, name)
+            try:
+                if now - os.path.getmtime(path) > RESULT_TTL:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    def _compute(self, fn):
+        with self._lock:
+            self._stats["computed"] += 1
+        return fn()
+
+    @staticmethod
+    def _read_result(path: str, not_before: float):
+        # only results finished while we were waiting count; older ones are stale
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('finished', 0) < not_before:
+            return None
+        return entry.get('result')
+
+    @staticmethod
+    def _write_result(path: str, result):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"finished": time.time(), "result": result}, f)
+        os.replace(tmp, path)
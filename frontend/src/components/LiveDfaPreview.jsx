@@ -0,0 +1,88 @@
+const COLUMN_GAP = 70
+const ROW_GAP = 44
+const RADIUS = 14
+
+// Layered drawing of a DFA that is still being constructed: states are placed
+// by BFS depth (column) in the order they were discovered (row), so nothing
+// already drawn moves when new states arrive.
+const layout = (states) => {
+  const rows = {}
+  const positions = {}
+
+  states.forEach((state) => {
+    const column = state.depth ?? 0
+    const row = rows[column] ?? 0
+    rows[column] = row + 1
+    positions[state.id] = {
+      x: RADIUS + 10 + column * COLUMN_GAP,
+      y: RADIUS + 10 + row * ROW_GAP,
+    }
+  })
+
+  return positions
+}
+
+const LiveDfaPreview = ({ states, transitions, done, truncated }) => {
+  const positions = layout(states)
+  const points = Object.values(positions)
+  const width = Math.max(200, ...points.map(({ x }) => x + RADIUS + 10))
+  const height = Math.max(80, ...points.map(({ y }) => y + RADIUS + 10))
+
+  return (
+    <div className="rounded-3xl bg-white p-6 shadow-xl">
+      <div className="flex items-center justify-between">
+        <h3 className="text-lg font-semibold text-slate-800">DFA construction</h3>
+        <span className="text-sm text-slate-500">
+          {states.length} states{done || truncated ? '' : ' so far...'}
+        </span>
+      </div>
+      <div className="mt-4 max-h-96 overflow-auto rounded-2xl border border-slate-100 bg-slate-50">
+        <svg width={width} height={height} role="img" aria-label="DFA being constructed">
+          {transitions.map(({ from, to, symbol }) => {
+            const a = positions[from]
+            const b = positions[to]
+            if (!a || !b || from === to) {
+              return null
+            }
+            return (
+              <line
+                key={`${from}-${symbol}-${to}`}
+                x1={a.x}
+                y1={a.y}
+                x2={b.x}
+                y2={b.y}
+                className="stroke-slate-300"
+              />
+            )
+          })}
+          {states.map(({ id, isTerminatingState }) => (
+            <g key={id}>
+              <circle
+                cx={positions[id].x}
+                cy={positions[id].y}
+                r={RADIUS}
+                className={isTerminatingState ? 'fill-blue-100 stroke-blue-500' : 'fill-white stroke-slate-400'}
+                strokeWidth={isTerminatingState ? 3 : 1.5}
+              />
+              <text
+                x={positions[id].x}
+                y={positions[id].y + 4}
+                textAnchor="middle"
+                className="fill-slate-700 text-[10px]"
+              >
+                {id}
+              </text>
+            </g>
+          ))}
+        </svg>
+      </div>
+      {truncated ? (
+        <p className="mt-2 text-xs text-slate-500">
+          Showing the first {states.length} states only.
+        </p>
+      ) : null}
+    </div>
+  )
+}
+
+export default LiveDfaPreview
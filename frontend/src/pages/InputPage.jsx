@@ -1,6 +1,7 @@
-import { useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { convertRegex, withAbsoluteResourceUrls } from '../utils/api'
+import LiveDfaPreview from '../components/LiveDfaPreview'
+import { convertRegex, streamDfa, withAbsoluteResourceUrls } from '../utils/api'
 
 const examplePatterns = [
   {
@@ -48,12 +49,92 @@ const saveHistory = (entries) => {
   window.localStorage.setItem('history', JSON.stringify(entries))
 }
 
+// Matches the server's STREAM_MAX_STATES; extra events are ignored so the
+// buffer (copied on every flush) stays small.
+const MAX_PREVIEW_STATES = 150
+
+const emptyPreview = { states: [], transitions: [], done: false, truncated: false }
+
 const InputPage = () => {
   const [regex, setRegex] = useState('')
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState('')
+  const [preview, setPreview] = useState(null)
+  const controllerRef = useRef(null)
   const navigate = useNavigate()
 
+  // Abort anything still running when leaving the page.
+  useEffect(() => () => controllerRef.current?.abort(), [])
+
+  // Draws the DFA from /convert/stream while the full conversion runs.
+  // Events are buffered and flushed once per animation frame.
+  const startPreview = (pattern, signal) => {
+    const buffer = { ...emptyPreview, states: [], transitions: [] }
+    const depth = {}
+    let scheduled = false
+
+    const flush = () => {
+      scheduled = false
+      if (signal.aborted) {
+        return
+      }
+      setPreview({
+        states: [...buffer.states],
+        transitions: [...buffer.transitions],
+        done: buffer.done,
+        truncated: buffer.truncated,
+      })
+    }
+
+    const onEvent = (event) => {
+      if (signal.aborted) {
+        return
+      }
+
+      if (event.type === 'state') {
+        if (buffer.states.length >= MAX_PREVIEW_STATES) {
+          buffer.truncated = true
+        } else {
+          if (event.start) {
+            depth[event.id] = 0
+          }
+          buffer.states.push({ ...event, depth: depth[event.id] })
+        }
+      } else if (event.type === 'transition') {
+        const last = buffer.states.length - 1
+        if (!(event.from in depth)) {
+          return
+        }
+        if (!(event.to in depth) && buffer.states[last]?.id === event.to) {
+          // BFS: a state is emitted right before the transition that found it.
+          // Replace the object, earlier flushes may already have handed it to React.
+          depth[event.to] = depth[event.from] + 1
+          buffer.states[last] = { ...buffer.states[last], depth: depth[event.to] }
+        }
+        if (event.to in depth) {
+          buffer.transitions.push(event)
+        }
+      } else if (event.type === 'truncated') {
+        buffer.truncated = true
+      } else if (event.type === 'done') {
+        buffer.done = true
+      }
+
+      if (!scheduled) {
+        scheduled = true
+        window.requestAnimationFrame(flush)
+      }
+    }
+
+    setPreview(emptyPreview)
+    // The preview is best effort; the conversion below reports real errors.
+    streamDfa(pattern, onEvent, { signal }).catch(() => {})
+  }
+
+  const handleCancel = () => {
+    controllerRef.current?.abort()
+  }
+
   const handleSubmit = async (event) => {
     event.preventDefault()
 
@@ -62,11 +143,15 @@ const InputPage = () => {
       return
     }
 
+    const controller = new AbortController()
+    controllerRef.current = controller
+
     try {
       setLoading(true)
       setError('')
 
-      const payload = await convertRegex(regex.trim())
+      startPreview(regex.trim(), controller.signal)
+      const payload = await convertRegex(regex.trim(), { signal: controller.signal })
 
       const entry = withAbsoluteResourceUrls({
         id: generateId(),
@@ -80,13 +165,20 @@ const InputPage = () => {
 
       navigate(`/result/${entry.id}`)
     } catch (err) {
+      if (controller.signal.aborted) {
+        setError('Conversion cancelled.')
+        return
+      }
       const message =
         err.response?.data?.message ??
         err.message ??
         'Conversion failed. Please try again.'
       setError(message)
     } finally {
+      // The preview is only useful while /convert runs: stop it either way.
+      controller.abort()
       setLoading(false)
+      controllerRef.current = null
     }
   }
 
@@ -140,6 +232,15 @@ const InputPage = () => {
                   >
                     {loading ? 'Converting...' : 'Convert to Automata'}
                   </button>
+                  {loading ? (
+                    <button
+                      type="button"
+                      className="inline-flex items-center justify-center rounded-full border border-rose-200 bg-rose-50 px-6 py-3 text-base font-semibold text-rose-600 transition hover:bg-rose-100 focus:outline-none focus:ring-2 focus:ring-rose-200"
+                      onClick={handleCancel}
+                    >
+                      Cancel
+                    </button>
+                  ) : null}
                   <button
                     type="button"
                     className="inline-flex items-center justify-center rounded-full border border-transparent bg-slate-200 px-6 py-3 text-base font-semibold text-slate-700 shadow-inner transition hover:bg-slate-300 focus:outline-none focus:ring-2 focus:ring-blue-200"
@@ -150,6 +251,12 @@ const InputPage = () => {
                 </div>
               </form>
             </div>
+
+            {preview ? (
+              <div className="mt-8">
+                <LiveDfaPreview {...preview} />
+              </div>
+            ) : null}
           </div>
 
           <aside className="lg:col-span-2">
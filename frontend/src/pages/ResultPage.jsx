@@ -81,9 +81,9 @@ const ResultPage = () => {
   ].filter(({ href }) => Boolean(href))
 
   const visualizations = [
-    { title: 'NFA', img: entry.nfa_img },
-    { title: 'DFA', img: entry.dfa_img },
-    { title: 'Minimized DFA', img: entry.mindfa_img },
+    { title: 'NFA', img: entry.nfa_img, render: entry.render?.nfa },
+    { title: 'DFA', img: entry.dfa_img, render: entry.render?.dfa },
+    { title: 'Minimized DFA', img: entry.mindfa_img, render: entry.render?.mindfa },
   ]
 
   return (
@@ -106,7 +106,7 @@ const ResultPage = () => {
           </div>
 
           <div className="mt-8 grid gap-6 md:grid-cols-3">
-            {visualizations.map(({ title, img }) => (
+            {visualizations.map(({ title, img, render }) => (
               <div
                 key={title}
                 className="flex flex-col overflow-hidden rounded-2xl border border-slate-100 bg-slate-50 shadow-sm"
@@ -121,6 +121,10 @@ const ResultPage = () => {
                       alt={`${title} visualization`}
                       className="max-h-72 w-full rounded-lg border border-slate-100 object-contain"
                     />
+                  ) : render?.level === 'skipped' ? (
+                    <p className="text-center text-sm text-slate-500">
+                      Too large to draw ({render.states} states). Download the JSON instead.
+                    </p>
                   ) : (
                     <p className="text-center text-sm text-slate-500">No image available.</p>
                   )}
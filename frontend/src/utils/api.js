@@ -85,10 +85,46 @@ export const withAbsoluteResourceUrls = (data) => {
   }, { ...data })
 }
 
-export const convertRegex = async (regex) => {
-  const response = await apiClient.post('/convert', { regex })
+export const convertRegex = async (regex, { signal } = {}) => {
+  const response = await apiClient.post('/convert', { regex }, { signal })
   return withAbsoluteResourceUrls(response.data)
 }
 
+// Streams DFA construction events ({ type: 'state' | 'transition' | 'done', ... })
+// from /convert/stream as they are discovered. Pass an AbortSignal to cancel.
+export const streamDfa = async (regex, onEvent, { signal } = {}) => {
+  const response = await fetch(`${API_BASE_URL.replace(/\/$/, '')}/convert/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ regex }),
+    signal,
+  })
+
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.error ?? `Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffered = ''
+
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) {
+      break
+    }
+
+    buffered += decoder.decode(value, { stream: true })
+    const lines = buffered.split('\n')
+    buffered = lines.pop()
+    lines.filter(Boolean).forEach((line) => onEvent(JSON.parse(line)))
+  }
+
+  if (buffered.trim()) {
+    onEvent(JSON.parse(buffered))
+  }
+}
+
 export default apiClient
 